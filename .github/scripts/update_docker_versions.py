@@ -2,10 +2,24 @@
 
 import pathlib
 import re
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import suppress
+from functools import cache
 
 import requests
 from packaging import version
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Share one session so that connections to each registry are kept alive
+session = requests.Session()
+session.mount(
+    "https://",
+    HTTPAdapter(
+        max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504])
+    ),
+)
+tag_regex = re.compile(r'tag=([^"]+)"')
 
 
 def get_dockerhub_versions(image_details: str) -> tuple[str, str, list[str]]:
@@ -15,7 +29,7 @@ def get_dockerhub_versions(image_details: str) -> tuple[str, str, list[str]]:
         namespace, image_name = image_name.split("/")
     else:
         namespace = "library"
-    response = requests.get(
+    response = session.get(
         f"https://registry.hub.docker.com/v2/repositories/{namespace}/{image_name}/tags?page_size=1000",
         timeout=60,
     )
@@ -26,14 +40,14 @@ def get_dockerhub_versions(image_details: str) -> tuple[str, str, list[str]]:
 def get_github_versions(image_details: str) -> tuple[str, str, list[str]]:
     """Get versions for GitHub images (via manual scraping)"""
     _, organisation, image_name, version = re.split("[:/]", image_details)
-    response = requests.get(
+    response = session.get(
         f"https://github.com/{organisation}/{image_name}/pkgs/container/{image_name}/versions",
         timeout=60,
     )
     versions = [
-        re.search(r"tag=([^\"]+)\"", line).group(1)
+        match.group(1)
         for line in response.content.decode("utf-8").split()
-        if "tag=" in line
+        if "tag=" in line and (match := tag_regex.search(line))
     ]
     return (image_name, version, versions)
 
@@ -41,7 +55,7 @@ def get_github_versions(image_details: str) -> tuple[str, str, list[str]]:
 def get_quayio_versions(image_details: str) -> tuple[str, str, list[str]]:
     """Get versions for Quay.IO images (via API)"""
     _, organisation, image_name, version = re.split("[:/]", image_details)
-    response = requests.get(
+    response = session.get(
         f"https://quay.io/api/v1/repository/{organisation}/{image_name}?includeTags=true",
         timeout=60,
     )
@@ -49,6 +63,16 @@ def get_quayio_versions(image_details: str) -> tuple[str, str, list[str]]:
     return (image_name, version, versions)
 
 
+@cache
+def get_versions(image_details: str) -> tuple[str, str, list[str]]:
+    """Get versions for an image, only querying each registry once per image"""
+    if image_details.startswith("ghcr.io"):
+        return get_github_versions(image_details)
+    if image_details.startswith("quay.io"):
+        return get_quayio_versions(image_details)
+    return get_dockerhub_versions(image_details)
+
+
 def annotate(
     versions: list[str], *, stable_only: bool
 ) -> list[tuple[str, version.Version]]:
@@ -67,20 +91,25 @@ def annotate(
     return annotated
 
 
-for filename in (pathlib.Path("data_safe_haven") / "infrastructure").glob("**/*.py"):
+filenames = list((pathlib.Path("data_safe_haven") / "infrastructure").glob("**/*.py"))
+
+# Fetch versions for all images in parallel, populating the get_versions cache
+images = set()
+for filename in filenames:
+    with open(filename) as f_pulumi:
+        images.update(line.split('"')[1] for line in f_pulumi if "image=" in line)
+with ThreadPoolExecutor(max_workers=8) as executor:
+    list(executor.map(get_versions, images))
+
+for filename in filenames:
     needs_replacement = False
     lines = []
     with open(filename) as f_pulumi:
         for line in f_pulumi:
             output = line
-            if re.search(r".*image=.*", line):
+            if "image=" in line:
                 image_details = line.split('"')[1]
-                if image_details.startswith("ghcr.io"):
-                    image, v_current, available = get_github_versions(image_details)
-                elif image_details.startswith("quay.io"):
-                    image, v_current, available = get_quayio_versions(image_details)
-                else:
-                    image, v_current, available = get_dockerhub_versions(image_details)
+                image, v_current, available = get_versions(image_details)
                 stable_versions = [v for v in annotate(available, stable_only=True)]
                 v_latest = sorted(stable_versions, key=lambda v: v[1], reverse=True)[0][0]
                 if v_current != v_latest:
@@ -6,10 +6,13 @@ import time
 from collections.abc import Sequence
 from contextlib import suppress
 from typing import Any, ClassVar, Self
+from urllib.parse import quote
 
 import requests
 import typer
 from dns import resolver
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from data_safe_haven import console
 from data_safe_haven.exceptions import (
@@ -24,6 +27,8 @@ from .credentials import DeferredCredential, GraphApiCredential
 class GraphApi:
     """Interface to the Microsoft Graph REST API"""
 
+    # Largest page size accepted by the list endpoints we use
+    page_size: ClassVar[int] = 999
     application_ids: ClassVar[dict[str, str]] = {
         "Microsoft Graph": "00000003-0000-0000-c000-000000000000",
     }
@@ -56,6 +61,23 @@ class GraphApi:
     ):
         self.base_endpoint = "https://graph.microsoft.com/v1.0"
         self.credential = credential
+        self._group_ids: dict[str, str] = {}
+        # Share one session so that connections are kept alive between requests.
+        # Throttled (429) or transient server errors are retried for GET and DELETE
+        # only: urllib3 does not retry non-idempotent methods such as POST or PATCH
+        self.session = requests.Session()
+        self.session.mount(
+            "https://",
+            HTTPAdapter(
+                max_retries=Retry(
+                    total=5,
+                    backoff_factor=0.5,
+                    status_forcelist=[429, 500, 502, 503, 504],
+                    respect_retry_after_header=True,
+                    raise_on_status=False,
+                )
+            ),
+        )
         self.logger = get_null_logger() if disable_logging else get_logger()
 
     @classmethod
@@ -140,19 +162,12 @@ class GraphApi:
         try:
             user_id = self.get_id_from_username(username)
             group_id = self.validate_entra_group(group_name)
-            json_response = self.http_get(
-                f"{self.base_endpoint}/groups/{group_id}/members",
-            ).json()
-            # If user already belongs to group then do nothing further
-            if any(user_id == member["id"] for member in json_response["value"]):
-                self.logger.info(
-                    f"User [green]'{username}'[/] is already a member of group [green]'{group_name}'[/]."
-                )
-            # Otherwise add the user to the group
-            else:
-                request_json = {
-                    "@odata.id": f"https://graph.microsoft.com/v1.0/directoryObjects/{user_id}"
-                }
+            request_json = {
+                "@odata.id": f"https://graph.microsoft.com/v1.0/directoryObjects/{user_id}"
+            }
+            # Try to add the user directly rather than listing all group members
+            # first: Graph rejects the request if the user is already a member
+            try:
                 self.http_post(
                     f"{self.base_endpoint}/groups/{group_id}/members/$ref",
                     json=request_json,
@@ -160,6 +175,12 @@ class GraphApi:
                 self.logger.info(
                     f"Added user [green]'{username}'[/] to group [green]'{group_name}'[/]."
                 )
+            except DataSafeHavenMicrosoftGraphError as exc:
+                if not self.http_already_exists(exc):
+                    raise
+                self.logger.info(
+                    f"User [green]'{username}'[/] is already a member of group [green]'{group_name}'[/]."
+                )
         except DataSafeHavenMicrosoftGraphError as exc:
             msg = f"Could not add user '{username}' to group '{group_name}'."
             raise DataSafeHavenMicrosoftGraphError(msg) from exc
@@ -333,17 +354,17 @@ class GraphApi:
                 if not application_json:
                     msg = f"Could not retrieve application '{application_name}'"
                     raise DataSafeHavenMicrosoftGraphError(msg)
-                self.http_post(
-                    f"{self.base_endpoint}/servicePrincipals",
-                    json={"appId": application_json["appId"]},
-                ).json()
+                # The response contains the new service principal so there is no
+                # need to look it up again
+                application_sp = dict(
+                    self.http_post(
+                        f"{self.base_endpoint}/servicePrincipals",
+                        json={"appId": application_json["appId"]},
+                    ).json()
+                )
                 self.logger.info(
                     f"Created service principal for application '[green]{application_name}[/]'.",
                 )
-                application_sp = self.get_service_principal_by_name(application_name)
-                if not application_sp:
-                    msg = f"service principal for application '[green]{application_name}[/]' not found."
-                    raise DataSafeHavenMicrosoftGraphError(msg)
             return application_sp
         except Exception as exc:
             msg = f"Could not create service principal for application '{application_name}'."
@@ -375,11 +396,12 @@ class GraphApi:
                     f"Creating Entra user '[green]{username}[/]'...",
                 )
                 final_verb = "Create"
-                # If they do not then create them
+                # If they do not then create them, keeping the account disabled
+                # until their authentication methods have been set
                 endpoint = f"{self.base_endpoint}/users"
                 json_response = self.http_post(
                     endpoint,
-                    json=request_json,
+                    json=request_json | {"accountEnabled": False},
                 ).json()
                 user_id = json_response["id"]
             # Set the authentication email address
@@ -458,11 +480,26 @@ class GraphApi:
             msg = f"Could not delete application '{application_name}'."
             raise DataSafeHavenMicrosoftGraphError(msg) from exc
 
+    @staticmethod
+    def odata_string(value: str) -> str:
+        """Quote and escape a string literal for use in an OData query option"""
+        return f"'{quote(value.replace("'", "''"))}'"
+
+    @classmethod
+    def display_name_filter(cls, display_name: str) -> str:
+        """OData query option selecting objects with a given display name"""
+        return f"$filter=displayName eq {cls.odata_string(display_name)}"
+
+    @classmethod
+    def user_principal_name_prefix_filter(cls, prefix: str) -> str:
+        """OData query option selecting users whose UPN starts with a given prefix"""
+        return f"$filter=startswith(userPrincipalName,{cls.odata_string(prefix)})"
+
     def get_application_by_name(self, application_name: str) -> dict[str, Any] | None:
         try:
             return next(
                 application
-                for application in self.read_applications()
+                for application in self.read_applications(display_name=application_name)
                 if application["displayName"] == application_name
             )
         except (DataSafeHavenMicrosoftGraphError, StopIteration):
@@ -474,7 +511,9 @@ class GraphApi:
         try:
             return next(
                 service_principal
-                for service_principal in self.read_service_principals()
+                for service_principal in self.read_service_principals(
+                    display_name=service_principal_name
+                )
                 if service_principal["displayName"] == service_principal_name
             )
         except (DataSafeHavenMicrosoftGraphError, StopIteration):
@@ -494,14 +533,20 @@ class GraphApi:
             raise DataSafeHavenMicrosoftGraphError(msg)
 
     def get_id_from_groupname(self, group_name: str) -> str | None:
+        # Group IDs do not change so we only need to look each one up once
+        if group_name in self._group_ids:
+            return self._group_ids[group_name]
         try:
-            return str(
+            self._group_ids[group_name] = str(
                 next(
                     group
-                    for group in self.read_groups()
+                    for group in self.read_groups(
+                        attributes=["displayName", "id"], display_name=group_name
+                    )
                     if group["displayName"] == group_name
                 )["id"]
             )
+            return self._group_ids[group_name]
         except (DataSafeHavenMicrosoftGraphError, StopIteration):
             return None
 
@@ -510,7 +555,10 @@ class GraphApi:
             return str(
                 next(
                     user
-                    for user in self.read_users()
+                    for user in self.read_users(
+                        attributes=["id", "userPrincipalName"],
+                        upn_prefix=f"{username}@",
+                    )
                     if user["userPrincipalName"].split("@")[0] == username
                 )["id"]
             )
@@ -668,6 +716,18 @@ class GraphApi:
             msg = f"Could not assign delegated role '{application_role_name}' to application '{application_name}'."
             raise DataSafeHavenMicrosoftGraphError(msg) from exc
 
+    @staticmethod
+    def http_already_exists(exc: DataSafeHavenMicrosoftGraphError) -> bool:
+        """Check whether a failed request was rejected because its target already exists"""
+        cause = exc.__cause__
+        return (
+            isinstance(cause, requests.exceptions.RequestException)
+            and cause.response is not None
+            and cause.response.status_code
+            in (requests.codes.BAD_REQUEST, requests.codes.CONFLICT)
+            and "already exist" in cause.response.text
+        )
+
     @staticmethod
     def http_raise_for_status(response: requests.Response) -> None:
         """Check the status of a response
@@ -692,7 +752,7 @@ class GraphApi:
             DataSafeHavenMicrosoftGraphError if the request failed
         """
         try:
-            response = requests.delete(
+            response = self.session.delete(
                 url,
                 headers={"Authorization": f"Bearer {self.token}"},
                 timeout=120,
@@ -717,7 +777,7 @@ class GraphApi:
             DataSafeHavenMicrosoftGraphError if the request failed
         """
         try:
-            response = requests.get(
+            response = self.session.get(
                 url,
                 headers={"Authorization": f"Bearer {self.token}"},
                 timeout=120,
@@ -777,7 +837,7 @@ class GraphApi:
             DataSafeHavenMicrosoftGraphError if the request failed
         """
         try:
-            response = requests.patch(
+            response = self.session.patch(
                 url,
                 headers={"Authorization": f"Bearer {self.token}"},
                 timeout=120,
@@ -801,7 +861,7 @@ class GraphApi:
             DataSafeHavenMicrosoftGraphError if the request failed
         """
         try:
-            response = requests.post(
+            response = self.session.post(
                 url,
                 headers={"Authorization": f"Bearer {self.token}"},
                 timeout=120,
@@ -818,8 +878,10 @@ class GraphApi:
                 msg += f" Response content received: '{exc.response.content.decode()}'."
             raise DataSafeHavenMicrosoftGraphError(msg) from exc
 
-    def read_applications(self) -> Sequence[dict[str, Any]]:
-        """Get list of applications
+    def read_applications(
+        self, display_name: str | None = None
+    ) -> Sequence[dict[str, Any]]:
+        """Get list of applications, optionally only those with a given display name
 
         Returns:
             JSON: A JSON list of applications
@@ -828,12 +890,10 @@ class GraphApi:
             DataSafeHavenMicrosoftGraphError if applications could not be loaded
         """
         try:
-            return [
-                dict(obj)
-                for obj in self.http_get(f"{self.base_endpoint}/applications").json()[
-                    "value"
-                ]
-            ]
+            endpoint = f"{self.base_endpoint}/applications?$top={self.page_size}"
+            if display_name:
+                endpoint += f"&{self.display_name_filter(display_name)}"
+            return [dict(obj) for obj in self.http_get(endpoint).json()["value"]]
         except Exception as exc:
             msg = "Could not load list of applications."
             raise DataSafeHavenMicrosoftGraphError(msg) from exc
@@ -880,8 +940,9 @@ class GraphApi:
     def read_groups(
         self,
         attributes: Sequence[str] | None = None,
+        display_name: str | None = None,
     ) -> Sequence[dict[str, Any]]:
-        """Get details of Entra groups
+        """Get details of Entra groups, optionally only those with a given display name
 
         Returns:
             JSON: A JSON list of Entra ID groups
@@ -890,31 +951,35 @@ class GraphApi:
             DataSafeHavenMicrosoftGraphError if groups could not be loaded
         """
         try:
-            endpoint = f"{self.base_endpoint}/groups"
+            endpoint = f"{self.base_endpoint}/groups?$top={self.page_size}"
             if attributes:
-                endpoint += f"?$select={','.join(attributes)}"
+                endpoint += f"&$select={','.join(attributes)}"
+            if display_name:
+                endpoint += f"&{self.display_name_filter(display_name)}"
             return [dict(obj) for obj in self.http_get(endpoint).json()["value"]]
         except Exception as exc:
             msg = "Could not load list of groups."
             raise DataSafeHavenMicrosoftGraphError(msg) from exc
 
-    def read_service_principals(self) -> Sequence[dict[str, Any]]:
-        """Get list of service principals"""
+    def read_service_principals(
+        self, display_name: str | None = None
+    ) -> Sequence[dict[str, Any]]:
+        """Get list of service principals, optionally only those with a given display name"""
         try:
-            return [
-                dict(obj)
-                for obj in self.http_get(
-                    f"{self.base_endpoint}/servicePrincipals"
-                ).json()["value"]
-            ]
+            endpoint = f"{self.base_endpoint}/servicePrincipals?$top={self.page_size}"
+            if display_name:
+                endpoint += f"&{self.display_name_filter(display_name)}"
+            return [dict(obj) for obj in self.http_get(endpoint).json()["value"]]
         except Exception as exc:
             msg = "Could not load list of service principals."
             raise DataSafeHavenMicrosoftGraphError(msg) from exc
 
     def read_users(
-        self, attributes: Sequence[str] | None = None
+        self,
+        attributes: Sequence[str] | None = None,
+        upn_prefix: str | None = None,
     ) -> Sequence[dict[str, Any]]:
-        """Get details of Entra users
+        """Get details of Entra users, optionally only those whose UPN has a given prefix
 
         Returns:
             JSON: A JSON list of Entra users
@@ -944,9 +1009,11 @@ class GraphApi:
         )
         users: Sequence[dict[str, Any]]
         try:
-            endpoint = f"{self.base_endpoint}/users"
+            endpoint = f"{self.base_endpoint}/users?$top={self.page_size}"
             if attributes:
-                endpoint += f"?$select={','.join(attributes)}"
+                endpoint += f"&$select={','.join(attributes)}"
+            if upn_prefix:
+                endpoint += f"&{self.user_principal_name_prefix_filter(upn_prefix)}"
             users = self.http_get(endpoint).json()["value"]
             administrators = self.http_get(
                 f"{self.base_endpoint}/directoryRoles/roleTemplateId="
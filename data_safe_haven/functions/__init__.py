@@ -3,6 +3,7 @@ from .strings import (
     alphanumeric,
     b64encode,
     get_key_vault_name,
+    get_storage_account_name,
     json_safe,
     next_occurrence,
     password,
@@ -17,6 +18,7 @@ __all__ = [
     "b64encode",
     "current_ip_address",
     "get_key_vault_name",
+    "get_storage_account_name",
     "ip_address_in_list",
     "json_safe",
     "next_occurrence",
@@ -1,5 +1,6 @@
 import base64
 import datetime
+import functools
 import hashlib
 import random
 import secrets
@@ -27,6 +28,13 @@ def get_key_vault_name(stack_name: str) -> str:
     return f"{''.join(truncate_tokens(stack_name.split('-'), 17))}secrets"
 
 
+def get_storage_account_name(stack_name: str, max_tokens: int, suffix: str) -> str:
+    """Storage account names have a maximum of 24 alphanumeric characters"""
+    return alphanumeric(
+        f"{''.join(truncate_tokens(stack_name.split('-'), max_tokens))}{suffix}"
+    )[:24]
+
+
 def json_safe(input_string: str) -> str:
     """Construct a JSON-safe version of an input string"""
     return alphanumeric(input_string).lower()
@@ -109,6 +117,7 @@ def seeded_uuid(seed: str) -> uuid.UUID:
     return uuid.UUID(int=generator.getrandbits(128), version=4)
 
 
+@functools.lru_cache(maxsize=512)
 def sha256hash(input_string: str) -> str:
     """Return the SHA256 hash of a string as a string."""
     return hashlib.sha256(input_string.encode("utf-8")).hexdigest()
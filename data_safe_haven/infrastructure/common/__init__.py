@@ -1,6 +1,7 @@
 from .dockerhub_credentials import DockerHubCredentials
 from .ip_ranges import SREDnsIpRanges, SREIpRanges
 from .transformations import (
+    as_output,
     get_address_prefixes_from_subnet,
     get_available_ips_from_subnet,
     get_id_from_rg,
@@ -15,6 +16,7 @@ from .transformations import (
 )
 
 __all__ = [
+    "as_output",
     "DockerHubCredentials",
     "get_address_prefixes_from_subnet",
     "get_available_ips_from_subnet",
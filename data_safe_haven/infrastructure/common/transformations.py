@@ -1,11 +1,22 @@
 """Common transformations needed when manipulating Pulumi resources"""
 
-from pulumi import Output
+from typing import TypeVar
+
+from pulumi import Input, Output
 from pulumi_azure_native import containerinstance, network, resources
 
 from data_safe_haven.exceptions import DataSafeHavenPulumiError
 from data_safe_haven.external import AzureIPv4Range
 
+T = TypeVar("T")
+
+
+def as_output(value: Input[T]) -> Output[T]:
+    """Wrap an input as an Output unless it is already one"""
+    if isinstance(value, Output):
+        return value
+    return Output.from_input(value)
+
 
 def get_address_prefixes_from_subnet(subnet: network.GetSubnetResult) -> list[str]:
     """Get list of CIDRs belonging to this subnet"""
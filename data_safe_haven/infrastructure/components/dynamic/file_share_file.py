@@ -1,10 +1,20 @@
 """Pulumi dynamic component for files uploaded to an Azure FileShare."""
 
 from contextlib import suppress
-from typing import Any
-
-from azure.core.exceptions import ResourceNotFoundError, ServiceRequestError
-from azure.storage.fileshare import ShareDirectoryClient, ShareFileClient
+from functools import lru_cache
+from typing import Any, ClassVar
+
+from azure.core.exceptions import (
+    AzureError,
+    ClientAuthenticationError,
+    ResourceExistsError,
+    ResourceNotFoundError,
+)
+from azure.storage.fileshare import (
+    ExponentialRetry,
+    ShareFileClient,
+    ShareServiceClient,
+)
 from pulumi import Input, Output, ResourceOptions
 from pulumi.dynamic import CreateResult, DiffResult, Resource
 
@@ -32,39 +42,66 @@ class FileShareFileProps:
 
 
 class FileShareFileProvider(DshResourceProvider):
+    # Number of parallel connections used when uploading ranges of a single file
+    max_concurrency: ClassVar[int] = 8
+    # Service clients are cached so that their connection pools are reused between
+    # calls to this provider
+    _service_clients: ClassVar[dict[tuple[str, str], ShareServiceClient]] = {}
+    # Directories that are known to exist, as (account, share, directory) tuples
+    _directories: ClassVar[set[tuple[str, str, str]]] = set()
+
     @staticmethod
     def file_exists(file_client: ShareFileClient) -> bool:
-        with suppress(ResourceNotFoundError, ServiceRequestError):
-            file_client.get_file_properties()
-            return True
-        return False
+        return bool(file_client.exists())
 
     @staticmethod
+    @lru_cache(maxsize=4096)
+    def split_destination_path(destination_path: str) -> tuple[str, str]:
+        """Split a destination path into its directory and file name"""
+        directory, _, file_name = destination_path.rpartition("/")
+        return (directory, file_name)
+
+    @classmethod
+    def get_service_client(
+        cls, storage_account_name: str, storage_account_key: str
+    ) -> ShareServiceClient:
+        key = (storage_account_name, storage_account_key)
+        if key not in cls._service_clients:
+            # Shorten the connection timeout and the backoff between retries so
+            # that an unreachable share fails in seconds: the SDK defaults wait
+            # 15s, 18s and 24s between its three retries
+            cls._service_clients[key] = ShareServiceClient(
+                account_url=f"https://{storage_account_name}.file.core.windows.net",
+                credential=storage_account_key,
+                connection_timeout=10,
+                retry_policy=ExponentialRetry(
+                    initial_backoff=1, increment_base=2, retry_total=3
+                ),
+            )
+        return cls._service_clients[key]
+
+    @classmethod
     def get_file_client(
+        cls,
         storage_account_name: str,
         storage_account_key: str,
         share_name: str,
         destination_path: str,
     ) -> ShareFileClient:
-        tokens = destination_path.split("/")
-        directory = "/".join(tokens[:-1])
-        file_name = tokens[-1]
+        directory, file_name = cls.split_destination_path(destination_path)
+        share_client = cls.get_service_client(
+            storage_account_name, storage_account_key
+        ).get_share_client(share_name)
         if directory:
-            directory_client = ShareDirectoryClient(
-                account_url=f"https://{storage_account_name}.file.core.windows.net",
-                share_name=share_name,
-                directory_path=directory,
-                credential=storage_account_key,
-            )
-            if not directory_client.exists():
-                directory_client.create_directory()
+            directory_client = share_client.get_directory_client(directory)
+            directory_key = (storage_account_name, share_name, directory)
+            if directory_key not in cls._directories:
+                # Creating directly avoids a separate round-trip to check existence
+                with suppress(ResourceExistsError):
+                    directory_client.create_directory()
+                cls._directories.add(directory_key)
             return directory_client.get_file_client(file_name)
-        return ShareFileClient(
-            account_url=f"https://{storage_account_name}.file.core.windows.net",
-            share_name=share_name,
-            file_path=file_name,
-            credential=storage_account_key,
-        )
+        return share_client.get_file_client(file_name)
 
     def create(self, props: dict[str, Any]) -> CreateResult:
         """Create file in target storage account with specified contents."""
@@ -77,7 +114,12 @@ class FileShareFileProvider(DshResourceProvider):
                 props["share_name"],
                 props["destination_path"],
             )
-            file_client.upload_file(props["file_contents"].encode("utf-8"))
+            file_contents = props["file_contents"].encode("utf-8")
+            file_client.upload_file(
+                file_contents,
+                length=len(file_contents),
+                max_concurrency=self.max_concurrency,
+            )
             outs["file_name"] = file_client.file_name
         except Exception as exc:
             file_name = file_client.file_name if file_client else ""
@@ -121,7 +163,7 @@ class FileShareFileProvider(DshResourceProvider):
         return self.partial_diff(old_props, new_props, ["storage_account_key"])
 
     def refresh(self, props: dict[str, Any]) -> dict[str, Any]:
-        with suppress(Exception):
+        try:
             file_client = FileShareFileProvider.get_file_client(
                 props["storage_account_name"],
                 props["storage_account_key"],
@@ -130,6 +172,11 @@ class FileShareFileProvider(DshResourceProvider):
             )
             if not FileShareFileProvider.file_exists(file_client):
                 props["file_name"] = ""
+        except (ClientAuthenticationError, ResourceNotFoundError):
+            pass
+        except AzureError as exc:
+            msg = f"Failed to refresh file '{props['destination_path']}' in [green]{props['share_name']}[/]."
+            raise DataSafeHavenAzureError(msg) from exc
         return dict(**props)
 
 
@@ -16,14 +16,14 @@ from pulumi_azure_native import (
 
 from data_safe_haven.external import AzureIPv4Range
 from data_safe_haven.functions import (
-    alphanumeric,
     get_key_vault_name,
+    get_storage_account_name,
     replace_separators,
     seeded_uuid,
     sha256hash,
-    truncate_tokens,
 )
 from data_safe_haven.infrastructure.common import (
+    as_output,
     get_id_from_rg,
     get_id_from_subnet,
     get_name_from_rg,
@@ -75,17 +75,15 @@ class SREDataProps:
         self.dns_record = dns_record
         self.password_dns_server_admin = dns_server_admin_password
         self.location = location
-        self.resource_group_id = Output.from_input(resource_group).apply(get_id_from_rg)
-        self.resource_group_name = Output.from_input(resource_group).apply(
-            get_name_from_rg
-        )
+        self.resource_group_id = as_output(resource_group).apply(get_id_from_rg)
+        self.resource_group_name = as_output(resource_group).apply(get_name_from_rg)
         self.sre_fqdn = sre_fqdn
         self.storage_quota_gb_home = storage_quota_gb_home
         self.storage_quota_gb_shared = storage_quota_gb_shared
-        self.subnet_data_configuration_id = Output.from_input(
-            subnet_data_configuration
-        ).apply(get_id_from_subnet)
-        self.subnet_data_private_id = Output.from_input(subnet_data_private).apply(
+        self.subnet_data_configuration_id = as_output(subnet_data_configuration).apply(
+            get_id_from_subnet
+        )
+        self.subnet_data_private_id = as_output(subnet_data_private).apply(
             get_id_from_subnet
         )
         self.subscription_id = subscription_id
@@ -112,6 +110,18 @@ class SREDataComponent(ComponentResource):
         child_opts = ResourceOptions.merge(opts, ResourceOptions(parent=self))
         child_tags = {"component": "data"} | (tags if tags else {})
 
+        # Construct storage account names
+        name_hash = sha256hash(self._name)
+        account_name_data_configuration = get_storage_account_name(
+            stack_name, 14, "configdata"
+        )
+        account_name_data_private_sensitive = get_storage_account_name(
+            stack_name, 11, f"sensitivedata{name_hash}"
+        )
+        account_name_data_private_user = get_storage_account_name(
+            stack_name, 16, f"userdata{name_hash}"
+        )
+
         # Define Key Vault reader
         identity_key_vault_reader = managedidentity.UserAssignedIdentity(
             f"{self._name}_id_key_vault_reader",
@@ -210,6 +220,9 @@ class SREDataComponent(ComponentResource):
             opts=child_opts,
             tags=child_tags,
         )
+        key_vault_opts = ResourceOptions.merge(
+            child_opts, ResourceOptions(parent=key_vault)
+        )
 
         # Define SSL certificate for this FQDN
         sre_fqdn_certificate = SSLCertificate(
@@ -225,10 +238,9 @@ class SREDataComponent(ComponentResource):
                 subscription_name=props.subscription_name,
             ),
             opts=ResourceOptions.merge(
-                child_opts,
+                key_vault_opts,
                 ResourceOptions(
                     depends_on=[props.dns_record],
-                    parent=key_vault,
                 ),  # we need the delegation NS record to exist before generating the certificate
             ),
         )
@@ -238,7 +250,7 @@ class SREDataComponent(ComponentResource):
             f"{self._name}_password_database_service_admin",
             length=20,
             special=True,
-            opts=ResourceOptions.merge(child_opts, ResourceOptions(parent=key_vault)),
+            opts=key_vault_opts,
         )
         keyvault.Secret(
             f"{self._name}_kvs_password_database_service_admin",
@@ -263,7 +275,7 @@ class SREDataComponent(ComponentResource):
             resource_group_name=props.resource_group_name,
             secret_name="password-dns-server-admin",
             vault_name=key_vault.name,
-            opts=ResourceOptions.merge(child_opts, ResourceOptions(parent=key_vault)),
+            opts=key_vault_opts,
             tags=child_tags,
         )
 
@@ -272,7 +284,7 @@ class SREDataComponent(ComponentResource):
             f"{self._name}_password_gitea_database_admin",
             length=20,
             special=True,
-            opts=ResourceOptions.merge(child_opts, ResourceOptions(parent=key_vault)),
+            opts=key_vault_opts,
         )
         keyvault.Secret(
             f"{self._name}_kvs_password_gitea_database_admin",
@@ -293,7 +305,7 @@ class SREDataComponent(ComponentResource):
             f"{self._name}_password_hedgedoc_database_admin",
             length=20,
             special=True,
-            opts=ResourceOptions.merge(child_opts, ResourceOptions(parent=key_vault)),
+            opts=key_vault_opts,
         )
         keyvault.Secret(
             f"{self._name}_kvs_password_hedgedoc_database_admin",
@@ -314,7 +326,7 @@ class SREDataComponent(ComponentResource):
             f"{self._name}_password_nexus_admin",
             length=20,
             special=True,
-            opts=ResourceOptions.merge(child_opts, ResourceOptions(parent=key_vault)),
+            opts=key_vault_opts,
         )
         keyvault.Secret(
             f"{self._name}_kvs_password_nexus_admin",
@@ -333,7 +345,7 @@ class SREDataComponent(ComponentResource):
             f"{self._name}_password_user_database_admin",
             length=20,
             special=True,
-            opts=ResourceOptions.merge(child_opts, ResourceOptions(parent=key_vault)),
+            opts=key_vault_opts,
         )
         kvs_password_user_database_admin = keyvault.Secret(
             f"{self._name}_kvs_password_user_database_admin",
@@ -354,7 +366,7 @@ class SREDataComponent(ComponentResource):
             f"{self._name}_password_workspace_admin",
             length=20,
             special=True,
-            opts=ResourceOptions.merge(child_opts, ResourceOptions(parent=key_vault)),
+            opts=key_vault_opts,
         )
         keyvault.Secret(
             f"{self._name}_kvs_password_workspace_admin",
@@ -372,10 +384,7 @@ class SREDataComponent(ComponentResource):
         # - This holds file shares that are mounted by Azure Container Instances
         storage_account_data_configuration = storage.StorageAccount(
             f"{self._name}_storage_account_data_configuration",
-            # Note that account names have a maximum of 24 characters
-            account_name=alphanumeric(
-                f"{''.join(truncate_tokens(stack_name.split('-'), 14))}configdata"
-            )[:24],
+            account_name=account_name_data_configuration,
             kind=storage.Kind.STORAGE_V2,
             large_file_shares_state=storage.LargeFileSharesState.DISABLED,
             location=props.location,
@@ -404,6 +413,9 @@ class SREDataComponent(ComponentResource):
             opts=child_opts,
             tags=child_tags,
         )
+        data_configuration_opts = ResourceOptions.merge(
+            child_opts, ResourceOptions(parent=storage_account_data_configuration)
+        )
         # Retrieve configuration data storage account keys
         storage_account_data_configuration_keys = Output.all(
             account_name=storage_account_data_configuration.name,
@@ -429,11 +441,8 @@ class SREDataComponent(ComponentResource):
             resource_group_name=props.resource_group_name,
             subnet=network.SubnetArgs(id=props.subnet_data_configuration_id),
             opts=ResourceOptions.merge(
-                child_opts,
-                ResourceOptions(
-                    ignore_changes=["custom_dns_configs"],
-                    parent=storage_account_data_configuration,
-                ),
+                data_configuration_opts,
+                ResourceOptions(ignore_changes=["custom_dns_configs"]),
             ),
             tags=child_tags,
         )
@@ -453,19 +462,14 @@ class SREDataComponent(ComponentResource):
             private_dns_zone_group_name=f"{stack_name}-dzg-storage-account-data-configuration",
             private_endpoint_name=storage_account_data_configuration_private_endpoint.name,
             resource_group_name=props.resource_group_name,
-            opts=ResourceOptions.merge(
-                child_opts, ResourceOptions(parent=storage_account_data_configuration)
-            ),
+            opts=data_configuration_opts,
         )
         # Deploy sensitive data blob storage account
         # - This holds the /mnt/input and /mnt/output containers that are mounted by workspaces
         # - Azure blobs have worse NFS support but can be accessed with Azure Storage Explorer
         storage_account_data_private_sensitive = WrappedNFSV3StorageAccount(
             f"{self._name}_storage_account_data_private_sensitive",
-            # Storage account names have a maximum of 24 characters
-            account_name=alphanumeric(
-                f"{''.join(truncate_tokens(stack_name.split('-'), 11))}sensitivedata{sha256hash(self._name)}"
-            )[:24],
+            account_name=account_name_data_private_sensitive,
             allowed_ip_addresses=props.data_private_sensitive_ip_addresses,
             location=props.location,
             subnet_id=props.subnet_data_private_id,
@@ -473,37 +477,39 @@ class SREDataComponent(ComponentResource):
             opts=child_opts,
             tags=child_tags,
         )
-        # Deploy storage containers
-        NFSV3BlobContainerComponent(
-            f"{self._name}_blob_egress",
-            NFSV3BlobContainerProps(
-                acl_user="rwx",
-                acl_group="rwx",
-                acl_other="rwx",
-                # due to an Azure bug `apply_default_permissions=True` also gives user
-                # 65533 ownership of the fileshare (preventing use inside the SRE)
-                apply_default_permissions=False,
-                container_name="egress",
-                resource_group_name=props.resource_group_name,
-                storage_account=storage_account_data_private_sensitive,
-                subscription_name=props.subscription_name,
-            ),
-        )
-        NFSV3BlobContainerComponent(
-            f"{self._name}_blob_ingress",
-            NFSV3BlobContainerProps(
-                acl_user="rwx",
-                acl_group="r-x",
-                acl_other="r-x",
-                # ensure that the above permissions are also set on any newly created
-                # files (eg. with Azure Storage Explorer)
-                apply_default_permissions=True,
-                container_name="ingress",
-                resource_group_name=props.resource_group_name,
-                storage_account=storage_account_data_private_sensitive,
-                subscription_name=props.subscription_name,
-            ),
+        data_private_sensitive_opts = ResourceOptions.merge(
+            child_opts, ResourceOptions(parent=storage_account_data_private_sensitive)
         )
+
+        # Deploy storage containers
+        # These differ only in their name and ACLs so we share a single factory
+        def _blob_container(
+            container_name: str,
+            acl_group: str,
+            acl_other: str,
+            *,
+            apply_default_permissions: bool,
+        ) -> NFSV3BlobContainerComponent:
+            return NFSV3BlobContainerComponent(
+                f"{self._name}_blob_{container_name}",
+                NFSV3BlobContainerProps(
+                    acl_user="rwx",
+                    acl_group=acl_group,
+                    acl_other=acl_other,
+                    apply_default_permissions=apply_default_permissions,
+                    container_name=container_name,
+                    resource_group_name=props.resource_group_name,
+                    storage_account=storage_account_data_private_sensitive,
+                    subscription_name=props.subscription_name,
+                ),
+            )
+
+        # due to an Azure bug `apply_default_permissions=True` also gives user 65533
+        # ownership of the fileshare (preventing use inside the SRE)
+        _blob_container("egress", "rwx", "rwx", apply_default_permissions=False)
+        # ensure that the ingress permissions are also set on any newly created files
+        # (eg. with Azure Storage Explorer)
+        _blob_container("ingress", "r-x", "r-x", apply_default_permissions=True)
         # Set up a private endpoint for the sensitive data storage account
         storage_account_data_private_sensitive_endpoint = network.PrivateEndpoint(
             f"{storage_account_data_private_sensitive._name}_private_endpoint",
@@ -519,11 +525,8 @@ class SREDataComponent(ComponentResource):
             resource_group_name=props.resource_group_name,
             subnet=network.SubnetArgs(id=props.subnet_data_private_id),
             opts=ResourceOptions.merge(
-                child_opts,
-                ResourceOptions(
-                    ignore_changes=["custom_dns_configs"],
-                    parent=storage_account_data_private_sensitive,
-                ),
+                data_private_sensitive_opts,
+                ResourceOptions(ignore_changes=["custom_dns_configs"]),
             ),
             tags=child_tags,
         )
@@ -543,10 +546,7 @@ class SREDataComponent(ComponentResource):
             private_dns_zone_group_name=f"{stack_name}-dzg-storage-account-data-private-sensitive",
             private_endpoint_name=storage_account_data_private_sensitive_endpoint.name,
             resource_group_name=props.resource_group_name,
-            opts=ResourceOptions.merge(
-                child_opts,
-                ResourceOptions(parent=storage_account_data_private_sensitive),
-            ),
+            opts=data_private_sensitive_opts,
         )
 
         # Give the "Storage Blob Data Owner" role to the Azure admin group
@@ -558,10 +558,9 @@ class SREDataComponent(ComponentResource):
             role_assignment_name=str(
                 seeded_uuid(f"{stack_name} Storage Blob Data Owner")
             ),
-            role_definition_id=Output.concat(
-                "/subscriptions/",
+            role_definition_id=Output.format(
+                "/subscriptions/{0}/providers/Microsoft.Authorization/roleDefinitions/{1}",
                 props.subscription_id,
-                "/providers/Microsoft.Authorization/roleDefinitions/",
                 self.azure_role_ids["Storage Blob Data Owner"],
             ),
             scope=props.resource_group_id,
@@ -577,10 +576,7 @@ class SREDataComponent(ComponentResource):
         storage_account_data_private_user = storage.StorageAccount(
             f"{self._name}_storage_account_data_private_user",
             access_tier=storage.AccessTier.COOL,
-            # Storage account names have a maximum of 24 characters
-            account_name=alphanumeric(
-                f"{''.join(truncate_tokens(stack_name.split('-'), 16))}userdata{sha256hash(self._name)}"
-            )[:24],
+            account_name=account_name_data_private_user,
             enable_https_traffic_only=False,
             encryption=storage.EncryptionArgs(
                 key_source=storage.KeySource.MICROSOFT_STORAGE,
@@ -607,6 +603,9 @@ class SREDataComponent(ComponentResource):
             opts=child_opts,
             tags=child_tags,
         )
+        data_private_user_opts = ResourceOptions.merge(
+            child_opts, ResourceOptions(parent=storage_account_data_private_user)
+        )
         storage.FileShare(
             f"{storage_account_data_private_user._name}_files_home",
             access_tier=storage.ShareAccessTier.PREMIUM,
@@ -618,9 +617,7 @@ class SREDataComponent(ComponentResource):
             share_name="home",
             share_quota=props.storage_quota_gb_home,
             signed_identifiers=[],
-            opts=ResourceOptions.merge(
-                child_opts, ResourceOptions(parent=storage_account_data_private_user)
-            ),
+            opts=data_private_user_opts,
         )
         storage.FileShare(
             f"{storage_account_data_private_user._name}_files_shared",
@@ -632,9 +629,7 @@ class SREDataComponent(ComponentResource):
             share_name="shared",
             share_quota=props.storage_quota_gb_shared,
             signed_identifiers=[],
-            opts=ResourceOptions.merge(
-                child_opts, ResourceOptions(parent=storage_account_data_private_user)
-            ),
+            opts=data_private_user_opts,
         )
         # Set up a private endpoint for the user data storage account
         storage_account_data_private_user_endpoint = network.PrivateEndpoint(
@@ -651,11 +646,8 @@ class SREDataComponent(ComponentResource):
             resource_group_name=props.resource_group_name,
             subnet=network.SubnetArgs(id=props.subnet_data_private_id),
             opts=ResourceOptions.merge(
-                child_opts,
-                ResourceOptions(
-                    ignore_changes=["custom_dns_configs"],
-                    parent=storage_account_data_private_user,
-                ),
+                data_private_user_opts,
+                ResourceOptions(ignore_changes=["custom_dns_configs"]),
             ),
             tags=child_tags,
         )
@@ -675,9 +667,7 @@ class SREDataComponent(ComponentResource):
             private_dns_zone_group_name=f"{stack_name}-dzg-storage-account-data-private-user",
             private_endpoint_name=storage_account_data_private_user_endpoint.name,
             resource_group_name=props.resource_group_name,
-            opts=ResourceOptions.merge(
-                child_opts, ResourceOptions(parent=storage_account_data_private_user)
-            ),
+            opts=data_private_user_opts,
         )
 
         # Register outputs
@@ -18,10 +18,9 @@ from pulumi_azure_native import (
 )
 
 from data_safe_haven.functions import (
-    alphanumeric,
+    get_storage_account_name,
     replace_separators,
     sha256hash,
-    truncate_tokens,
 )
 from data_safe_haven.infrastructure.common import (
     get_id_from_rg,
@@ -104,9 +103,9 @@ class SREDesiredStateComponent(ComponentResource):
         # - Azure blobs have worse NFS support but can be accessed with Azure Storage Explorer
         storage_account = WrappedNFSV3StorageAccount(
             f"{self._name}_storage_account",
-            account_name=alphanumeric(
-                f"{''.join(truncate_tokens(stack_name.split('-'), 11))}desiredstate{sha256hash(self._name)}"
-            )[:24],
+            account_name=get_storage_account_name(
+                stack_name, 11, f"desiredstate{sha256hash(self._name)}"
+            ),
             allowed_ip_addresses=props.admin_ip_addresses,
             location=props.location,
             resource_group_name=props.resource_group_name,
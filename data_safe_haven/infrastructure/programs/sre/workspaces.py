@@ -92,12 +92,14 @@ class SREWorkspacesComponent(ComponentResource):
         child_tags = {"component": "workspaces"} | (tags if tags else {})
 
         # Load cloud-init file
-        cloudinit = Output.all(
+        # This is templated and encoded inside an Output so that it does not block
+        # construction of other resources, and is shared between all workspaces
+        b64cloudinit = Output.all(
             apt_proxy_server_hostname=props.apt_proxy_server_hostname,
             storage_account_desired_state_name=props.storage_account_desired_state_name,
             storage_account_data_private_user_name=props.storage_account_data_private_user_name,
             storage_account_data_private_sensitive_name=props.storage_account_data_private_sensitive_name,
-        ).apply(lambda kwargs: self.template_cloudinit(**kwargs))
+        ).apply(lambda kwargs: b64encode(self.template_cloudinit(**kwargs)))
 
         # Deploy a variable number of VMs depending on the input parameters
         vms = [
@@ -106,7 +108,7 @@ class SREWorkspacesComponent(ComponentResource):
                 LinuxVMComponentProps(
                     admin_password=props.admin_password,
                     admin_username=props.admin_username,
-                    b64cloudinit=cloudinit.apply(b64encode),
+                    b64cloudinit=b64cloudinit,
                     data_collection_rule_id=props.data_collection_rule_id,
                     data_collection_endpoint_id=props.data_collection_endpoint_id,
                     ip_address_private=props.vm_ip_addresses[vm_idx],
@@ -13,6 +13,9 @@ from data_safe_haven.types import PathType
 
 T = TypeVar("T", bound="YAMLSerialisableModel")
 
+# Use the libyaml parser where PyYAML was built with it
+_YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
 
 class YAMLSerialisableModel(BaseModel, validate_assignment=True):
     """
@@ -36,7 +39,7 @@ class YAMLSerialisableModel(BaseModel, validate_assignment=True):
     def from_yaml(cls: type[T], settings_yaml: str) -> T:
         """Construct a YAMLSerialisableModel from a YAML string"""
         try:
-            settings_dict = yaml.safe_load(settings_yaml)
+            settings_dict = yaml.load(settings_yaml, Loader=_YamlLoader)  # noqa: S506
         except yaml.YAMLError as exc:
             msg = f"Could not parse {cls.config_type} configuration as YAML."
             raise DataSafeHavenConfigError(msg) from exc
@@ -6,21 +6,19 @@ from typing import TypeVar
 import pytz
 from fqdn import FQDN
 
-
-def aad_guid(aad_guid: str) -> str:
-    if not re.match(
-        r"^[a-z0-9]{8}-[a-z0-9]{4}-[a-z0-9]{4}-[a-z0-9]{4}-[a-z0-9]{12}$",
-        aad_guid,
-    ):
-        msg = "Expected GUID, for example '10de18e7-b238-6f1e-a4ad-772708929203'."
-        raise ValueError(msg)
-    return aad_guid
-
-
-def azure_location(azure_location: str) -> str:
-    # Generate a list of locations with the following command:
-    # `az account list-locations --query "[?metadata.regionType == 'Physical'].name"`
-    locations = [
+# Compile the patterns once rather than looking them up in the re cache on each call
+AAD_GUID_PATTERN = re.compile(
+    r"^[a-z0-9]{8}-[a-z0-9]{4}-[a-z0-9]{4}-[a-z0-9]{4}-[a-z0-9]{12}$"
+)
+AZURE_SUBSCRIPTION_NAME_PATTERN = re.compile(r"^[a-zA-Z0-9\- \[\]]+$")
+AZURE_VM_SKU_PATTERN = re.compile(r"^(Standard|Basic)_\w+$")
+EMAIL_ADDRESS_PATTERN = re.compile(r"^\S+@\S+$")
+SAFE_STRING_PATTERN = re.compile(r"^[a-zA-Z0-9_-]*$")
+
+# Generate a list of locations with the following command:
+# `az account list-locations --query "[?metadata.regionType == 'Physical'].name"`
+AZURE_LOCATIONS = frozenset(
+    {
         "australiacentral",
         "australiacentral2",
         "australiaeast",
@@ -76,8 +74,19 @@ def azure_location(azure_location: str) -> str:
         "westus",
         "westus2",
         "westus3",
-    ]
-    if azure_location not in locations:
+    }
+)
+
+
+def aad_guid(aad_guid: str) -> str:
+    if not AAD_GUID_PATTERN.match(aad_guid):
+        msg = "Expected GUID, for example '10de18e7-b238-6f1e-a4ad-772708929203'."
+        raise ValueError(msg)
+    return aad_guid
+
+
+def azure_location(azure_location: str) -> str:
+    if azure_location not in AZURE_LOCATIONS:
         msg = "Expected valid Azure location, for example 'uksouth'."
         raise ValueError(msg)
     return azure_location
@@ -85,14 +94,14 @@ def azure_location(azure_location: str) -> str:
 
 def azure_subscription_name(subscription_name: str) -> str:
     # https://learn.microsoft.com/en-us/azure/azure-resource-manager/management/resource-name-rules
-    if not re.match(r"^[a-zA-Z0-9\- \[\]]+$", subscription_name):
+    if not AZURE_SUBSCRIPTION_NAME_PATTERN.match(subscription_name):
         msg = "Azure subscription names can only contain alphanumeric characters, spaces and particular special characters."
         raise ValueError(msg)
     return subscription_name
 
 
 def azure_vm_sku(azure_vm_sku: str) -> str:
-    if not re.match(r"^(Standard|Basic)_\w+$", azure_vm_sku):
+    if not AZURE_VM_SKU_PATTERN.match(azure_vm_sku):
         msg = "Expected valid Azure VM SKU, for example 'Standard_D2s_v4'."
         raise ValueError(msg)
     return azure_vm_sku
@@ -107,7 +116,7 @@ def fqdn(domain: str) -> str:
 
 
 def email_address(email_address: str) -> str:
-    if not re.match(r"^\S+@\S+$", email_address):
+    if not EMAIL_ADDRESS_PATTERN.match(email_address):
         msg = "Expected valid email address, for example 'sherlock@holmes.com'."
         raise ValueError(msg)
     return email_address
@@ -129,14 +138,14 @@ def ip_address(ip_address: str) -> str:
 
 
 def safe_string(safe_string: str) -> str:
-    if not re.match(r"^[a-zA-Z0-9_-]*$", safe_string) or not safe_string:
+    if not SAFE_STRING_PATTERN.match(safe_string) or not safe_string:
         msg = "Expected valid string containing only letters, numbers, hyphens and underscores."
         raise ValueError(msg)
     return safe_string
 
 
 def timezone(timezone: str) -> str:
-    if timezone not in pytz.all_timezones:
+    if timezone not in pytz.all_timezones_set:
         msg = "Expected valid timezone, for example 'Europe/London'."
         raise ValueError(msg)
     return timezone
@@ -17,9 +17,7 @@ class TestContext:
     def test_constructor(self, context_dict):
         context = Context(**context_dict)
         assert isinstance(context, Context)
-        assert all(
-            getattr(context, item) == context_dict[item] for item in context_dict.keys()
-        )
+        assert context.model_dump() == context_dict
         assert context.storage_container_name == "config"
         assert context.pulumi_storage_container_name == "pulumi"
         assert context.pulumi_encryption_key_name == "pulumi-encryption-key"
@@ -139,15 +137,12 @@ class TestContextManager:
         with pytest.raises(DataSafeHavenConfigError, match="No context selected"):
             settings.assert_context()
 
-    def test_missing_selected(self, context_yaml):
-        context_yaml = "\n".join(
-            [line for line in context_yaml.splitlines() if "selected:" not in line]
-        )
+    def test_missing_selected(self, context_yaml_missing_selected):
         with pytest.raises(
             DataSafeHavenTypeError,
             match="ContextManager configuration is invalid.",
         ):
-            ContextManager.from_yaml(context_yaml)
+            ContextManager.from_yaml(context_yaml_missing_selected)
 
     def test_invalid_selected_input(self, context_yaml):
         context_yaml = context_yaml.replace(
@@ -189,23 +184,13 @@ class TestContextManager:
         ):
             context_manager.selected = "invalid"
 
-    def test_context(self, context_yaml, context_manager):
-        yaml_dict = yaml.safe_load(context_yaml)
-        assert isinstance(context_manager.context, Context)
-        assert all(
-            getattr(context_manager.context, item)
-            == yaml_dict["contexts"]["acmedeployment"][item]
-            for item in yaml_dict["contexts"]["acmedeployment"].keys()
-        )
-
-    def test_set_context(self, context_yaml, context_manager):
-        yaml_dict = yaml.safe_load(context_yaml)
-        context_manager.selected = "gems"
+    @pytest.mark.parametrize("selected", ["acmedeployment", "gems"])
+    def test_context(self, context_yaml_dict, context_manager, selected):
+        context_manager.selected = selected
         assert isinstance(context_manager.context, Context)
-        assert all(
-            getattr(context_manager.context, item)
-            == yaml_dict["contexts"]["gems"][item]
-            for item in yaml_dict["contexts"]["gems"].keys()
+        assert (
+            context_manager.context.model_dump()
+            == context_yaml_dict["contexts"][selected]
         )
 
     def test_set_context_none(self, context_manager):
@@ -229,16 +214,14 @@ class TestContextManager:
         assert all(isinstance(item, str) for item in available)
         assert available == ["acmedeployment", "gems"]
 
-    def test_update(self, context_manager):
-        assert context_manager.context.description == "Acme Deployment"
-        assert context_manager.context.name == "acmedeployment"
-        context_manager.update(name="replaced")
-        assert context_manager.context.name == "replaced"
-
-    def test_set_update(self, context_manager):
-        context_manager.selected = "gems"
-        assert context_manager.context.description == "Gems"
-        assert context_manager.context.name == "gems"
+    @pytest.mark.parametrize(
+        "selected,description",
+        [("acmedeployment", "Acme Deployment"), ("gems", "Gems")],
+    )
+    def test_update(self, context_manager, selected, description):
+        context_manager.selected = selected
+        assert context_manager.context.description == description
+        assert context_manager.context.name == selected
         context_manager.update(name="replaced")
         assert context_manager.context.name == "replaced"
 
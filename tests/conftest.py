@@ -101,7 +101,9 @@ def config_subsection_storage_quota_gb() -> ConfigSubsectionStorageQuotaGB:
 
 @fixture
 def context(context_dict):
-    return Context(**context_dict)
+    # context_dict is known to be valid so we skip validation here; tests of
+    # validation itself construct their own Context
+    return Context.model_construct(**context_dict)
 
 
 @fixture
@@ -121,7 +123,13 @@ def context_no_secrets(monkeypatch, context_dict) -> Context:
 
 
 @fixture
-def context_manager(context_yaml) -> ContextManager:
+def context_manager(context_manager_parsed) -> ContextManager:
+    # Tests may modify the context manager so each one gets its own copy
+    return context_manager_parsed.model_copy(deep=True)
+
+
+@fixture(scope="session")
+def context_manager_parsed(context_yaml) -> ContextManager:
     return ContextManager.from_yaml(context_yaml)
 
 
@@ -131,7 +139,7 @@ def context_tmpdir(context_dict, tmpdir, monkeypatch) -> tuple[Context, Path]:
     return (Context(**context_dict), tmpdir)
 
 
-@fixture
+@fixture(scope="session")
 def context_yaml():
     content = """---
     selected: acmedeployment
@@ -150,6 +158,16 @@ def context_yaml():
     return yaml.dump(yaml.safe_load(content))
 
 
+@fixture(scope="session")
+def context_yaml_dict(context_yaml):
+    return yaml.safe_load(context_yaml)
+
+
+@fixture(scope="session")
+def context_yaml_missing_selected(context_yaml):
+    return context_yaml.replace("selected: acmedeployment\n", "")
+
+
 @fixture
 def local_project_settings(context_no_secrets, mocker):  # noqa: ARG001
     """Overwrite adjust project settings to work locally, no secrets"""
@@ -389,7 +407,7 @@ def pulumi_project_stack_config():
     }
 
 
-@fixture
+@fixture(scope="session")
 def pulumi_config_yaml() -> str:
     content = """---
     encrypted_key: CALbHybtRdxKjSnr9UYY
@@ -437,7 +455,7 @@ def shm_config_file(shm_config_yaml: str, tmp_path: Path) -> Path:
     return config_file_path
 
 
-@fixture
+@fixture(scope="session")
 def shm_config_yaml(request):
     content = (
         """---
@@ -498,7 +516,7 @@ def sre_config_alternate(
     )
 
 
-@fixture
+@fixture(scope="session")
 def sre_config_yaml(request):
     content = """---
     azure:
@@ -534,7 +552,7 @@ def sre_config_yaml(request):
     return yaml.dump(yaml.safe_load(content))
 
 
-@fixture
+@fixture(scope="session")
 def sre_config_yaml_missing_field(sre_config_yaml):
     content = sre_config_yaml.replace("admin_email_address: admin@example.com", "")
     return yaml.dump(yaml.safe_load(content))
@@ -54,6 +54,94 @@ class TestGraphApi:
         result = api.add_custom_domain(domain_name)
         assert result == "txt-record-text"
 
+    def test_add_user_to_group_already_member(
+        self,
+        request,
+        requests_mock,
+        mock_graphapicredential_get_token,  # noqa: ARG002
+    ):
+        requests_mock.get(
+            "https://graph.microsoft.com/v1.0/users",
+            json={"value": [{"userPrincipalName": "ada@example.com", "id": "user-id"}]},
+        )
+        requests_mock.get(
+            "https://graph.microsoft.com/v1.0/directoryRoles/roleTemplateId=62e90394-69f5-4237-9190-012177145e10/members",
+            json={"value": []},
+        )
+        requests_mock.get(
+            "https://graph.microsoft.com/v1.0/groups",
+            json={"value": [{"displayName": "Admins", "id": "group-id"}]},
+        )
+        requests_mock.post(
+            "https://graph.microsoft.com/v1.0/groups/group-id/members/$ref",
+            status_code=400,
+            text="One or more added object references already exist.",
+        )
+        api = GraphApi.from_scopes(scopes=[], tenant_id=request.config.guid_tenant)
+        api.add_user_to_group("ada", "Admins")
+        assert not any(
+            "/groups/group-id/members" in req.url and req.method == "GET"
+            for req in requests_mock.request_history
+        )
+
+    def test_get_application_by_name(
+        self,
+        request,
+        requests_mock,
+        mock_graphapicredential_get_token,  # noqa: ARG002
+    ):
+        requests_mock.get(
+            "https://graph.microsoft.com/v1.0/applications",
+            json={"value": [{"displayName": "Data Safe Haven", "id": "app-id"}]},
+        )
+        api = GraphApi.from_scopes(scopes=[], tenant_id=request.config.guid_tenant)
+        application = api.get_application_by_name("Data Safe Haven")
+        assert application == {"displayName": "Data Safe Haven", "id": "app-id"}
+        assert "$filter=displayName" in requests_mock.last_request.url
+        assert api.get_application_by_name("Missing") is None
+
+    def test_get_id_from_groupname(
+        self,
+        request,
+        requests_mock,
+        mock_graphapicredential_get_token,  # noqa: ARG002
+    ):
+        requests_mock.get(
+            "https://graph.microsoft.com/v1.0/groups",
+            json={"value": [{"displayName": "Admins", "id": "group-id"}]},
+        )
+        api = GraphApi.from_scopes(scopes=[], tenant_id=request.config.guid_tenant)
+        assert api.get_id_from_groupname("Admins") == "group-id"
+        assert api.get_id_from_groupname("Admins") == "group-id"
+        assert requests_mock.call_count == 1
+        assert "$filter=displayName" in requests_mock.last_request.url
+
+    def test_get_id_from_username(
+        self,
+        request,
+        requests_mock,
+        mock_graphapicredential_get_token,  # noqa: ARG002
+    ):
+        requests_mock.get(
+            "https://graph.microsoft.com/v1.0/users",
+            json={
+                "value": [
+                    {"userPrincipalName": "ada@example.com", "id": "user-id"},
+                    {"userPrincipalName": "ada.lovelace@example.com", "id": "other"},
+                ]
+            },
+        )
+        requests_mock.get(
+            "https://graph.microsoft.com/v1.0/directoryRoles/roleTemplateId=62e90394-69f5-4237-9190-012177145e10/members",
+            json={"value": []},
+        )
+        api = GraphApi.from_scopes(scopes=[], tenant_id=request.config.guid_tenant)
+        assert api.get_id_from_username("ada") == "user-id"
+        assert (
+            "startswith(userPrincipalName,'ada%40')"
+            in requests_mock.request_history[0].url
+        )
+
     def test_http_get_failure(
         self,
         request,
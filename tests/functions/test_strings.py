@@ -3,9 +3,12 @@ from freezegun import freeze_time
 
 from data_safe_haven.exceptions import DataSafeHavenValueError
 from data_safe_haven.functions import (
+    alphanumeric,
     get_key_vault_name,
+    get_storage_account_name,
     json_safe,
     next_occurrence,
+    sha256hash,
 )
 
 
@@ -72,9 +75,34 @@ def test_get_key_vault_name(value, expected):
     assert get_key_vault_name(value) == expected
 
 
+@pytest.mark.parametrize(
+    "value,expected",
+    [
+        (r"shm-a-sre-b", "shmasrebdesiredstate0123"),
+        (r"shm-verylongshmname-sre-verylongsrename", "shversreverdesiredstate0"),
+        (r"shm_a-sre b", "shmasrebdesiredstate0123"),
+    ],
+)
+def test_get_storage_account_name(value, expected):
+    assert get_storage_account_name(value, 11, "desiredstate0123456789") == expected
+
+
 @pytest.mark.parametrize(
     "value,expected",
     [(r"Test SRE", "testsre"), (r"%*aBc", "abc"), (r"MY_SRE", "mysre")],
 )
 def test_json_safe(value, expected):
     assert json_safe(value) == expected
+
+
+class TestAlphanumeric:
+    def test_alphanumeric(self):
+        assert alphanumeric("shm-acme_deployment 2") == "shmacmedeployment2"
+
+
+class TestSha256Hash:
+    def test_sha256hash(self):
+        assert (
+            sha256hash("hello")
+            == "2cf24dba5fb0a30e26e83b2ac5b9e29e1b161e5c1fa7425e73043362938b9824"
+        )